@@ -42,7 +42,7 @@ def run_url_workflow(url: str, out_dir: Path):
     console.print(f"\n[bold green]✓ Done! Results in {out_dir}[/bold green]")
 
 def robust_rmtree(path: Path):
-    """Windows-friendly rmtree with retries and fallback to shell rmdir."""
+    """Windows-friendly rmtree with backoff retries and a manual scandir sweep as fallback."""
     if not path.exists():
         return
     
@@ -54,17 +54,36 @@ def robust_rmtree(path: Path):
         os.chmod(path, stat.S_IWRITE)
         func(path)
 
-    for i in range(3):
+    def force_remove(func, path):
+        try:
+            func(path)
+        except PermissionError:
+            os.chmod(path, stat.S_IWRITE)
+            func(path)
+
+    def sweep(path):
+        """Delete bottom-up with direct unlink/rmdir calls."""
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    sweep(entry.path)
+                else:
+                    force_remove(os.unlink, entry.path)
+        force_remove(os.rmdir, path)
+
+    attempts = 5
+    for i in range(attempts):
         try:
             shutil.rmtree(path, onerror=on_error)
             return
         except Exception:
-            time.sleep(1)
+            if i < attempts - 1:
+                time.sleep(0.2 * 2 ** i)
     
-    # Final fallback via shell
+    # Final fallback: sweep the tree ourselves
     try:
-        os.system(f'rmdir /s /q "{path}"')
-    except Exception as e:
+        sweep(path)
+    except OSError as e:
         console.print(f"[yellow]⚠ Warning: Could not clean up {path}: {e}[/yellow]")
 
 def run_batch_workflow(n: int, out_dir: Path):
@@ -1,10 +1,23 @@
+import os
 import re
+import sys
 import csv
+import gzip
 import json
+import atexit
+import hashlib
+from contextlib import nullcontext
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup, Tag
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+try:
+    import ahocorasick
+except ImportError:  # fall back to per-literal substring checks
+    ahocorasick = None
 
 # -----------------------------
 # CONFIG (DEFAULTS)
@@ -12,6 +25,10 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskPr
 INPUT_DIR = Path("html_out")
 OUT_DIR = Path("out")
 JSON_DIR = OUT_DIR / "json"
+PARSE_CACHE_VERSION = "6"  # bump when parser output changes to invalidate .parse_cache
+RICH_PROGRESS_MAX_FILES = 2000  # above this (or without a TTY) print plain progress lines
+PLAIN_PROGRESS_EVERY = 500
+PARSE_BATCH_SIZE = 32  # files per worker task
 
 # -----------------------------
 # RULE-BASED ONTOLOGY TAGS
@@ -69,15 +86,110 @@ ONTOLOGY_KEYWORDS = {
     }
 }
 
+def _compile_category(label_map: dict):
+    """
+    Fuses every pattern of a category into one alternation of named groups
+    (g0, g1, ...) so the text is scanned once per category instead of once per pattern.
+    Returns (combined_pattern, {group_name: label}).
+    """
+    alternatives = []
+    group_to_label = {}
+    for label, patterns in label_map.items():
+        for pat in patterns:
+            group = f"g{len(alternatives)}"
+            alternatives.append(f"(?P<{group}>{pat})")
+            group_to_label[group] = label
+    return re.compile("|".join(alternatives), re.I), group_to_label
+
+_OPTIONAL_ATOM_RE = re.compile(r"(?:\\.|\[[^\]]*\]|\([^)]*\)|.)\?")
+_REGEX_META_RE = re.compile(r"\\.|\[[^\]]*\]|[()*+.^$]")
+_LITERAL_RUN_RE = re.compile(r"[a-z0-9]+")
+
+def _literal_core(pat: str) -> str:
+    """
+    Longest lowercase alphanumeric run that every match of `pat` must contain,
+    e.g. r"\bcells?\b" -> "cell". Returns "" when no safe literal exists.
+    """
+    if "|" in pat:
+        return ""
+    stripped = _OPTIONAL_ATOM_RE.sub(" ", pat)
+    stripped = _REGEX_META_RE.sub(" ", stripped)
+    runs = _LITERAL_RUN_RE.findall(stripped.lower())
+    return max(runs, key=len) if runs else ""
+
+# Patterns that are just \b<words>\b: a whole-word literal hit is already a match
+_PLAIN_WORDS_RE = re.compile(r"\\b([a-z0-9]+(?: [a-z0-9]+)*)\\b")
+
+def _pattern_literal(pat: str):
+    """(literal, exact): exact means the pattern is the whole-word literal itself."""
+    plain = _PLAIN_WORDS_RE.fullmatch(pat)
+    if plain:
+        return plain.group(1), True
+    return _literal_core(pat), False
+
+ONTOLOGY_COMBINED = {}
+ONTOLOGY_GROUP_TO_LABEL = {}
+ONTOLOGY_LITERALS = {}  # category -> [(literal, exact, label)] for the literal precheck
+for _category, _label_map in ONTOLOGY_KEYWORDS.items():
+    ONTOLOGY_COMBINED[_category], ONTOLOGY_GROUP_TO_LABEL[_category] = _compile_category(_label_map)
+    ONTOLOGY_LITERALS[_category] = [
+        (*_pattern_literal(pat), label)
+        for label, patterns in _label_map.items()
+        for pat in patterns
+    ]
+
+# Labels with no usable literal always go to the regex
+ONTOLOGY_ALWAYS = {
+    category: {label for literal, _exact, label in literals if not literal}
+    for category, literals in ONTOLOGY_LITERALS.items()
+}
+
+# One Aho-Corasick automaton over every literal: literal -> (literal, [(category, label, exact)])
+ONTOLOGY_AUTOMATON = None
+if ahocorasick is not None:
+    _entries = {}
+    for _category, _literals in ONTOLOGY_LITERALS.items():
+        for _literal, _exact, _label in _literals:
+            if _literal:
+                _entries.setdefault(_literal, []).append((_category, _label, _exact))
+    ONTOLOGY_AUTOMATON = ahocorasick.Automaton()
+    for _literal, _values in _entries.items():
+        ONTOLOGY_AUTOMATON.add_word(_literal, (_literal, _values))
+    ONTOLOGY_AUTOMATON.make_automaton()
+
 # -----------------------------
 # HELPERS
 # -----------------------------
 MONTH_RE = r"(January|February|March|April|May|June|July|August|September|October|November|December)"
+MONTH_NUM = {
+    "january": 1, "february": 2, "march": 3, "april": 4,
+    "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12
+}
+
+_WS_RE = re.compile(r"\s+")
+# Site chrome stripped from page text; \s+ because this runs before whitespace is squeezed
+_BOILER_RE = re.compile(r"\bSkip\s+to\s+main\s+content\b|\bNational\s+Science\s+Foundation\b\s+Search", re.I)
+_ISO_DATE_RE = re.compile(rf"\b{MONTH_RE}\s+(\d{{1,2}}),\s*(\d{{4}})\b", re.I)
+_DATE_RE = re.compile(rf"\b{MONTH_RE}\s+\d{{1,2}},\s+\d{{4}}\b", re.I)
+_LEADING_DATE_RE = re.compile(rf"^{MONTH_RE}\s+\d{{1,2}},\s+\d{{4}}\s*", re.I)
+_DEADLINE_LABEL_RE = re.compile(r"Full Proposal Deadline(?:\(s\))?", re.I)
+_ANYTIME_RE = re.compile(r"\bProposals Accepted Anytime\b", re.I)
+# Money tokens: $1,000, $15M, $14,000,000, ... with the number and unit captured separately
+_MONEY_RE = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)(?:\s*([KMB]|million|billion))?", re.I)
+MONEY_UNIT = {
+    "": 1,
+    "k": 1_000,
+    "m": 1_000_000, "million": 1_000_000,
+    "b": 1_000_000_000, "billion": 1_000_000_000,
+}
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+TAG_TEXT_MAX_CHARS = 20_000
 
 def clean_text(text: str) -> str:
     if not text:
         return ""
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 def safe_text(tag: Tag) -> str:
     if not tag:
@@ -86,26 +198,19 @@ def safe_text(tag: Tag) -> str:
 
 def page_text(soup: BeautifulSoup) -> str:
     root = soup.find("main") or soup.body or soup
-    txt = clean_text(root.get_text(" ", strip=True))
-    txt = re.sub(r"\bSkip to main content\b", " ", txt, flags=re.I)
-    txt = re.sub(r"\bNational Science Foundation\b\s+Search", " ", txt, flags=re.I)
+    txt = _BOILER_RE.sub(" ", root.get_text(" ", strip=True))
     return clean_text(txt)
 
 def normalize_iso_date_from_text(text: str):
     if not text:
         return None
-    m = re.search(rf"\b{MONTH_RE}\s+(\d{{1,2}}),\s*(\d{{4}})\b", text, re.I)
+    m = _ISO_DATE_RE.search(text)
     if not m:
         return None
     month_name = m.group(1).lower()
     day = int(m.group(2))
     year = int(m.group(3))
-    month_map = {
-        "january": 1, "february": 2, "march": 3, "april": 4,
-        "may": 5, "june": 6, "july": 7, "august": 8,
-        "september": 9, "october": 10, "november": 11, "december": 12
-    }
-    month = month_map[month_name]
+    month = MONTH_NUM[month_name]
     return f"{year:04d}-{month:02d}-{day:02d}"
 
 def get_canonical_url(soup: BeautifulSoup) -> str:
@@ -147,13 +252,12 @@ def extract_title_and_foa_id(soup: BeautifulSoup, file_stem: str):
 
     return foa_id, title
 
-def extract_agency(soup: BeautifulSoup) -> str:
-    txt = page_text(soup)
+def extract_agency(txt: str) -> str:
     if "National Science Foundation" in txt or "NSF - U.S. National Science Foundation" in txt:
         return "National Science Foundation (NSF)"
     return "Unknown"
 
-def extract_posted_date_as_open_date(soup: BeautifulSoup):
+def extract_posted_date_as_open_date(soup: BeautifulSoup, txt: str):
     # DOM path
     for span in soup.find_all("span", class_=re.compile(r"document-info_label")):
         if re.fullmatch(r"Posted:\s*", safe_text(span), re.I):
@@ -163,7 +267,6 @@ def extract_posted_date_as_open_date(soup: BeautifulSoup):
                 return normalize_iso_date_from_text(raw), raw
 
     # Text fallback
-    txt = page_text(soup)
     m = re.search(rf"\bPosted\s*:\s*{MONTH_RE}\s+\d{{1,2}},\s+\d{{4}}\b", txt, re.I)
     if m:
         raw = re.sub(r"^Posted\s*:\s*", "", m.group(0), flags=re.I).strip()
@@ -173,36 +276,61 @@ def extract_posted_date_as_open_date(soup: BeautifulSoup):
 # -----------------------------
 # SECTION SLICER (TEXT-BASED)
 # -----------------------------
-def slice_between_markers(txt: str, start_patterns, end_patterns):
+# Roman-numeral section headers, matched in a single pass over the page text
+_SECTION_HEADERS = {
+    "description": r"\bII\.\s*Program Description\b",
+    "award": r"\bIII\.\s*Award Information\b",
+    "eligibility": r"\bIV\.\s*Eligibility(?: Information)?\b",
+    "preparation": r"\bV\.\s*Proposal Preparation\b",
+    "processing": r"\bVI\.\s*(?:NSF Proposal Processing|Proposal Review Information)\b",
+}
+SECTIONS_RE = re.compile(
+    "(?:" + "|".join(f"(?P<{name}>{pat})" for name, pat in _SECTION_HEADERS.items()) + r")\s*:?",
+    re.I,
+)
+# Headers that close each section; cross-references to earlier sections
+# (e.g. "described in II. Program Description") must not cut it short
+_SECTION_ENDS = {
+    "description": ("award",),
+    "award": ("eligibility", "preparation"),
+    "eligibility": ("preparation", "processing"),
+    "preparation": ("processing",),
+}
+_OVERALL_APPROACH_RE = re.compile(r"\bOverall Approach\b", re.I)
+
+def find_sections(txt: str) -> dict:
+    """
+    Maps section name -> (start, end) offsets into txt: from the end of the first
+    header of that section up to the next header listed in _SECTION_ENDS for it.
+    """
+    headers = list(SECTIONS_RE.finditer(txt or ""))
+    sections = {}
+    for i, m in enumerate(headers):
+        name = m.lastgroup
+        if name in sections:
+            continue
+        ends = _SECTION_ENDS.get(name, ())
+        end = next((h.start() for h in headers[i + 1:] if h.lastgroup in ends), len(txt))
+        sections[name] = (m.end(), end)
+    return sections
+
+def section_text(txt: str, sections: dict, name: str, end_re: re.Pattern = None) -> str:
     """
-    Returns text after first matching start marker until first matching end marker.
+    Returns the text of one section from find_sections(), optionally cut at the first
+    end_re match inside it. txt must be the normalized page_text().
     """
-    if not txt:
+    span = sections.get(name)
+    if not span:
         return ""
 
-    start_idx = None
-    start_end = None
-
-    for sp in start_patterns:
-        m = re.search(sp, txt, flags=re.I)
+    start, end = span
+    if end_re is not None:
+        m = end_re.search(txt, start, end)
         if m:
-            curr_start = m.start()
-            if start_idx is None or curr_start < start_idx:
-                start_idx = curr_start
-                start_end = m.end()
-
-    if start_idx is None:
-        return ""
-
-    tail = txt[start_end:]
+            end = m.start()
 
-    end_pos = len(tail)
-    for ep in end_patterns:
-        m = re.search(ep, tail, flags=re.I)
-        if m and m.start() < end_pos:
-            end_pos = m.start()
-
-    return clean_text(tail[:end_pos])
+    # txt comes from page_text() and is already whitespace-normalized
+    return txt[start:end].strip()
 
 # -----------------------------
 # REQUESTED CHANGES
@@ -215,7 +343,7 @@ def slice_between_markers(txt: str, start_patterns, end_patterns):
 #    - ONLY under "III. Award Information"
 #    - extract dollar-starting amount/range only
 # -----------------------------
-def extract_due_dates(soup: BeautifulSoup):
+def extract_due_dates(txt: str):
     """
     Returns (dates_raw, close_date)
     dates_raw will be:
@@ -226,51 +354,37 @@ def extract_due_dates(soup: BeautifulSoup):
       - ISO date if explicit due date found
       - None if Proposals Accepted Anytime / not found
     """
-    txt = page_text(soup)
 
     # Search around Full Proposal Deadline label occurrences
-    label_iter = list(re.finditer(r"Full Proposal Deadline(?:\(s\))?", txt, flags=re.I))
-
-    for m in label_iter:
+    for m in _DEADLINE_LABEL_RE.finditer(txt):
         window = txt[m.start(): m.start() + 500]  # local window only to avoid page-wide contamination
 
-        if re.search(r"Proposals Accepted Anytime", window, re.I):
+        if _ANYTIME_RE.search(window):
             return "Proposals Accepted Anytime", None
 
-        d = re.search(rf"\b{MONTH_RE}\s+\d{{1,2}},\s+\d{{4}}\b", window, re.I)
+        d = _DATE_RE.search(window)
         if d:
             raw_date = d.group(0)
             return raw_date, normalize_iso_date_from_text(raw_date)
 
     # Fallback: if page mentions proposals accepted anytime anywhere (and no labeled date found)
-    if re.search(r"\bProposals Accepted Anytime\b", txt, re.I):
+    if _ANYTIME_RE.search(txt):
         return "Proposals Accepted Anytime", None
 
     return "", None
 
-def extract_program_description(soup: BeautifulSoup) -> str:
+def extract_program_description(txt: str, sections: dict) -> str:
     """
     ONLY extract from II. Program Description to III. Award Information.
     """
-    txt = page_text(soup)
 
-    desc = slice_between_markers(
-        txt,
-        start_patterns=[
-            r"\bII\.\s*Program Description\b\s*:?",
-        ],
-        end_patterns=[
-            r"\bOverall Approach\b",
-            r"\bIII\.\s*Award Information\b",
-        ],
-    )
+    desc = section_text(txt, sections, "description", end_re=_OVERALL_APPROACH_RE)
 
     if not desc:
         return ""
 
     # Remove accidental leading date if present
-    desc = re.sub(rf"^{MONTH_RE}\s+\d{{1,2}},\s+\d{{4}}\s*", "", desc, flags=re.I)
-    desc = clean_text(desc)
+    desc = _LEADING_DATE_RE.sub("", desc)
 
     # Minimal safety filter
     if len(desc) < 40:
@@ -278,53 +392,25 @@ def extract_program_description(soup: BeautifulSoup) -> str:
 
     return desc
 
-def extract_award_data(soup: BeautifulSoup):
+def extract_award_data(txt: str, sections: dict):
     """
     Extracts total_award and award_range from Section III.
     Returns: (total_award_str, award_range_str)
     """
-    txt = page_text(soup)
 
     # 1. Isolate Section III: Award Information
-    award_section = slice_between_markers(
-        txt,
-        start_patterns=[r"\bIII\.\s*Award Information\b"],
-        end_patterns=[
-            r"\bIV\.\s*Eligibility Information\b",
-            r"\bIV\.\s*Eligibility\b",
-            r"\bV\.\s*Proposal Preparation\b"
-        ]
-    )
+    award_section = section_text(txt, sections, "award")
 
     if not award_section:
         return None, None
 
-    # 2. Regex for money tokens: catches $1,000, $15M, $14,000,000, etc.
-    money_regex = r"\$\s*\d[\d,]*(?:\.\d+)?(?:\s*(?:[KMB]|million|billion))?"
-
-    # Find all individual money instances in the text
-    all_amounts_raw = re.findall(money_regex, award_section, flags=re.I)
-
-    if not all_amounts_raw:
-        return None, None
-
-    # Convert strings to numbers for comparison to find min/max
-    def to_num(s):
-        s = s.replace('$', '').replace(',', '').lower().strip()
-        multiplier = 1
-        if 'm' in s or 'million' in s: multiplier = 1_000_000
-        elif 'b' in s or 'billion' in s: multiplier = 1_000_000_000
-        elif 'k' in s: multiplier = 1_000
-        # Clean non-numeric characters for float conversion
-        val = re.sub(r'[^\d.]', '', s)
-        try:
-            return float(val) * multiplier if val else 0
-        except ValueError:
-            return 0
-
-    # Create a list of tuples (original_string, numeric_value)
-    parsed_amounts = [(amt, to_num(amt)) for amt in all_amounts_raw]
-    parsed_amounts = [p for p in parsed_amounts if p[1] > 0]
+    # 2. One pass over the money tokens, converting each to a number inline
+    # as a list of tuples (original_string, numeric_value)
+    parsed_amounts = []
+    for m in _MONEY_RE.finditer(award_section):
+        value = float(m.group(1).replace(",", "")) * MONEY_UNIT[(m.group(2) or "").lower()]
+        if value > 0:
+            parsed_amounts.append((m.group(0), value))
 
     if not parsed_amounts:
         return None, None
@@ -344,25 +430,11 @@ def extract_award_data(soup: BeautifulSoup):
         # If only one smaller number is found, it's a single value award
         award_range = other_amounts[0][0]
 
-    return clean_text(total_award), award_range
-
-def extract_eligibility(soup: BeautifulSoup) -> str:
-    txt = page_text(soup)
+    return total_award, award_range
 
+def extract_eligibility(txt: str, sections: dict) -> str:
     # Try "IV. Eligibility Information" section first
-    sec = slice_between_markers(
-        txt,
-        start_patterns=[
-            r"\bIV\.\s*Eligibility Information\b\s*:?",
-            r"\bIV\.\s*Eligibility\b\s*:?",
-        ],
-        end_patterns=[
-            r"\bV\.\s*Proposal Preparation and Submission Instructions\b",
-            r"\bV\.\s*Proposal Preparation\b",
-            r"\bVI\.\s*NSF Proposal Processing\b",
-            r"\bVI\.\s*Proposal Review Information\b",
-        ],
-    )
+    sec = section_text(txt, sections, "eligibility")
     if sec:
         # If "Who May Submit Proposals:" exists inside, prefer content after that label
         m = re.search(
@@ -371,7 +443,7 @@ def extract_eligibility(soup: BeautifulSoup) -> str:
             re.I,
         )
         if m:
-            cand = clean_text(m.group(1))
+            cand = m.group(1)
             if len(cand) > 30:
                 return cand
         if len(sec) > 30:
@@ -384,7 +456,7 @@ def extract_eligibility(soup: BeautifulSoup) -> str:
         re.I,
     )
     if m:
-        cand = clean_text(m.group(1))
+        cand = m.group(1).strip()
         if len(cand) > 30:
             return cand
 
@@ -393,6 +465,42 @@ def extract_eligibility(soup: BeautifulSoup) -> str:
 # -----------------------------
 # TAGGING
 # -----------------------------
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+def _literal_hits(text_lower: str, word_bounds: bool = True):
+    """
+    Literal precheck over the lowercased text. Returns (found, candidates), both
+    category -> set of labels: `found` labels already matched a plain-word pattern as a
+    whole word; `candidates` labels had a literal occur and still need the regex.
+    With word_bounds=False every hit is only a candidate, for text whose lowercasing
+    changed its length (e.g. "İ" -> "i" + U+0307) and so its word boundaries.
+    """
+    found = {category: set() for category in ONTOLOGY_KEYWORDS}
+    candidates = {category: set(labels) for category, labels in ONTOLOGY_ALWAYS.items()}
+
+    if ONTOLOGY_AUTOMATON is None:
+        for category, literals in ONTOLOGY_LITERALS.items():
+            candidates[category].update(label for literal, _exact, label in literals if literal in text_lower)
+        return found, candidates
+
+    # Single Aho-Corasick pass, independent of the number of literals
+    n = len(text_lower)
+    for end, (literal, entries) in ONTOLOGY_AUTOMATON.iter(text_lower):
+        start = end - len(literal) + 1
+        whole_word = (
+            (start == 0 or not _is_word_char(text_lower[start - 1]))
+            and (end + 1 == n or not _is_word_char(text_lower[end + 1]))
+        )
+        for category, label, exact in entries:
+            if not exact:
+                candidates[category].add(label)
+            elif not word_bounds:
+                candidates[category].add(label)
+            elif whole_word:
+                found[category].add(label)
+    return found, candidates
+
 def apply_semantic_tagging(text: str):
     tags = {
         "research_domains": [],
@@ -402,34 +510,66 @@ def apply_semantic_tagging(text: str):
     }
     text = text or ""
 
+    text_lower = text.lower()
+    found, candidates = _literal_hits(text_lower, word_bounds=len(text_lower) == len(text))
+
     for category, label_map in ONTOLOGY_KEYWORDS.items():
-        for label, patterns in label_map.items():
-            for pat in patterns:
-                if re.search(pat, text, re.I):
-                    tags[category].append(label)
+        hits = found[category]
+        pending = candidates[category] - hits
+        if pending:
+            # Confirm the remaining candidates with the fused regex, stopping once all are seen
+            group_to_label = ONTOLOGY_GROUP_TO_LABEL[category]
+            for m in ONTOLOGY_COMBINED[category].finditer(text):
+                hits.add(group_to_label[m.lastgroup])
+                if pending <= hits:
                     break
+        # Keep declaration order, as before
+        tags[category] = [label for label in label_map if label in hits]
     return tags
 
 # -----------------------------
 # PARSER
 # -----------------------------
+def html_file_stem(html_path: Path) -> str:
+    # "page.html.gz" and "page.html" both map to "page"
+    name = html_path.name
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return name[:-5] if name.endswith(".html") else Path(name).stem
+
+def read_html_bytes(html_path: Path) -> bytes:
+    # The scraper archives gzip-encoded responses as-is under *.html.gz
+    opener = gzip.open if html_path.name.endswith(".gz") else open
+    with opener(html_path, "rb") as f:
+        return f.read()
+
 def parse_nsf_html(html_path: Path):
-    with open(html_path, "r", encoding="utf-8", errors="ignore") as f:
-        soup = BeautifulSoup(f, "html.parser")
+    return parse_nsf_html_bytes(read_html_bytes(html_path), html_file_stem(html_path))
 
-    foa_id, title = extract_title_and_foa_id(soup, html_path.stem)
-    agency = extract_agency(soup)
+def parse_nsf_html_bytes(html_bytes: bytes, file_stem: str):
+    # One full parse: the title <h1> and the "Posted:" label may sit outside <main>
+    soup = BeautifulSoup(html_bytes, "lxml")
+
+    # Page text is the input of every text-based extractor; build it once,
+    # along with the offsets of its numbered sections
+    txt = page_text(soup)
+    sections = find_sections(txt)
+
+    foa_id, title = extract_title_and_foa_id(soup, file_stem)
+    agency = extract_agency(txt)
     source_url = get_canonical_url(soup)
 
-    posted_iso, _posted_raw = extract_posted_date_as_open_date(soup)
-    dates_raw, close_date = extract_due_dates(soup)
+    posted_iso, _posted_raw = extract_posted_date_as_open_date(soup, txt)
+    dates_raw, close_date = extract_due_dates(txt)
     open_date = posted_iso
 
-    eligibility = extract_eligibility(soup)
-    description = extract_program_description(soup)
-    total_award, award_range = extract_award_data(soup)
+    eligibility = extract_eligibility(txt, sections)
+    description = extract_program_description(txt, sections)
+    total_award, award_range = extract_award_data(txt, sections)
 
     tag_text = " ".join([title, description, eligibility, award_range or "", total_award or "", dates_raw])
+    # Description and eligibility often repeat sentences; drop repeats (order kept) and bound the scan
+    tag_text = " ".join(dict.fromkeys(_SENTENCE_SPLIT_RE.split(tag_text)))[:TAG_TEXT_MAX_CHARS]
     semantic_tags = apply_semantic_tagging(tag_text)
 
     return {
@@ -451,84 +591,187 @@ def parse_nsf_html(html_path: Path):
 # -----------------------------
 # CSV FLATTEN
 # -----------------------------
-def flatten_for_csv(record: dict):
+CSV_FIELDS = (
+    "foa_id",
+    "title",
+    "agency",
+    "open_date",
+    "close_date",
+    "dates_raw",
+    "eligibility_text",
+    "program_description",
+    "total_award",
+    "award_range",
+    "source_url",
+    "tags_research_domains",
+    "tags_methods_approaches",
+    "tags_populations",
+    "tags_sponsor_themes",
+)
+
+def flatten_for_csv(record: dict) -> tuple:
+    """Returns one CSV row as a tuple in CSV_FIELDS order."""
     tags = record.get("semantic_tags", {})
-    return {
-        "foa_id": record.get("foa_id", ""),
-        "title": record.get("title", ""),
-        "agency": record.get("agency", ""),
-        "open_date": record.get("open_date", "") or "",
-        "close_date": record.get("close_date", "") or "",
-        "dates_raw": record.get("dates_raw", ""),
-        "eligibility_text": record.get("eligibility_text", ""),
-        "program_description": record.get("program_description", ""),
-        "total_award": record.get("total_award", ""),
-        "award_range": record.get("award_range", ""),
-        "source_url": record.get("source_url", ""),
-        "tags_research_domains": "; ".join(tags.get("research_domains", [])),
-        "tags_methods_approaches": "; ".join(tags.get("methods_approaches", [])),
-        "tags_populations": "; ".join(tags.get("populations", [])),
-        "tags_sponsor_themes": "; ".join(tags.get("sponsor_themes", [])),
-    }
+    return (
+        record.get("foa_id", ""),
+        record.get("title", ""),
+        record.get("agency", ""),
+        record.get("open_date", "") or "",
+        record.get("close_date", "") or "",
+        record.get("dates_raw", ""),
+        record.get("eligibility_text", ""),
+        record.get("program_description", ""),
+        record.get("total_award", ""),
+        record.get("award_range", ""),
+        record.get("source_url", ""),
+        "; ".join(tags.get("research_domains", [])),
+        "; ".join(tags.get("methods_approaches", [])),
+        "; ".join(tags.get("populations", [])),
+        "; ".join(tags.get("sponsor_themes", [])),
+    )
+
+# -----------------------------
+# JSON ENCODING
+# -----------------------------
+def dump_json_bytes(obj, indent: bool = False) -> bytes:
+    """UTF-8 JSON bytes via orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+def load_json_bytes(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 # -----------------------------
 # MAIN BATCH RUN
 # -----------------------------
-def process_file(html_file: Path, json_dir: Path):
-    """Helper to parse a single file and save its JSON."""
+_POOL = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Shared parser process pool, created on first use and kept warm across batch runs."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+        atexit.register(_POOL.shutdown)
+    return _POOL
+
+def parse_cache_key(html_bytes: bytes, file_stem: str) -> str:
+    # The file stem feeds the foa_id/title fallbacks, so it is part of the key
+    h = hashlib.sha1(PARSE_CACHE_VERSION.encode("utf-8"))
+    h.update(file_stem.encode("utf-8") + b"\0")
+    h.update(html_bytes)
+    return h.hexdigest()
+
+def process_file(html_file: Path, json_dir: Path, cache_dir: Path = None):
+    """Helper to parse a single file and save its JSON, reusing cache_dir hits when given."""
     try:
-        rec = parse_nsf_html(html_file)
-        with open(json_dir / f"{html_file.stem}.json", "w", encoding="utf-8") as f:
-            json.dump(rec, f, ensure_ascii=False, indent=2)
+        html_bytes = read_html_bytes(html_file)
+        stem = html_file_stem(html_file)
+
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = cache_dir / f"{parse_cache_key(html_bytes, stem)}.json"
+            if cache_path.exists():
+                data = cache_path.read_bytes()
+                (json_dir / f"{stem}.json").write_bytes(data)
+                return load_json_bytes(data)
+
+        rec = parse_nsf_html_bytes(html_bytes, stem)
+        data = dump_json_bytes(rec, indent=True)
+        (json_dir / f"{stem}.json").write_bytes(data)
+
+        if cache_path is not None:
+            # Write-then-rename so a concurrent or interrupted run never sees a partial entry
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
         return rec
     except Exception as e:
         return None
 
+def parse_batch(html_files: list, json_dir: Path, cache_dir: Path = None) -> list:
+    """Parses a chunk of files in one worker task; failed files come back as None."""
+    return [process_file(f, json_dir, cache_dir) for f in html_files]
+
 def run_batch_parsing(input_dir: Path, out_dir: Path, json_dir: Path):
     out_dir.mkdir(parents=True, exist_ok=True)
     json_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir = out_dir / ".parse_cache"
+    cache_dir.mkdir(exist_ok=True)
 
-    html_files = sorted(input_dir.glob("*.html"))
+    html_files = sorted([*input_dir.glob("*.html"), *input_dir.glob("*.html.gz")])
     if not html_files:
         print(f"No HTML files found in {input_dir.resolve()}")
-        return []
-
-    all_records = []
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        transient=True,
-    ) as progress:
-        task = progress.add_task("[cyan]Parsing HTML files...", total=len(html_files))
-        
-        with ThreadPoolExecutor() as executor:
-            # map maintains order, but we can also use as_completed
-            futures = [executor.submit(process_file, f, json_dir) for f in html_files]
-            for future in futures:
-                res = future.result()
-                if res:
-                    all_records.append(res)
-                progress.update(task, advance=1)
-
-    # Combined JSON
-    if all_records:
-        with open(out_dir / "foas.json", "w", encoding="utf-8") as f:
-            json.dump(all_records, f, ensure_ascii=False, indent=2)
-
-        # Combined CSV
-        rows = [flatten_for_csv(r) for r in all_records]
-        with open(out_dir / "foas.csv", "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            w.writeheader()
-            w.writerows(rows)
-
-    print(f"Done: {len(all_records)} files processed.")
-    print(f"Combined JSON: {out_dir / 'foas.json'}")
-    print(f"Combined CSV: {out_dir / 'foas.csv'}")
-    return all_records
+        return 0
+
+    jsonl_path = out_dir / "foas.jsonl"
+    csv_path = out_dir / "foas.csv"
+    n_records = 0
+    n_done = 0
+    n_files = len(html_files)
+
+    # Rich's live renderer is only worth it for interactive, moderately sized runs
+    use_rich = sys.stdout.isatty() and n_files <= RICH_PROGRESS_MAX_FILES
+    if use_rich:
+        # Imported here so parser workers (and non-TTY runs) never load Rich
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+
+        progress_ctx = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            transient=True,
+        )
+    else:
+        progress_ctx = nullcontext()
+
+    # Records are streamed to the combined outputs as they arrive, so memory stays flat
+    with open(jsonl_path, "wb") as jsonl_f, open(csv_path, "w", newline="", encoding="utf-8") as csv_f:
+        csv_writer = csv.writer(csv_f)
+        csv_writer.writerow(CSV_FIELDS)
+
+        with progress_ctx as progress:
+            if use_rich:
+                task = progress.add_task("[cyan]Parsing HTML files...", total=n_files)
+
+            # Parsing is CPU-bound, so use processes; tiny batches aren't worth the spawn cost
+            if n_files < 4:
+                n_workers = n_files
+                pool_ctx = ThreadPoolExecutor(max_workers=n_workers)
+            else:
+                n_workers = os.cpu_count() or 1
+                pool_ctx = nullcontext(_get_pool())  # persistent pool: don't shut it down here
+
+            # Send files in chunks so each task amortizes its overhead, but keep every worker busy
+            chunk_size = max(1, min(PARSE_BATCH_SIZE, -(-n_files // n_workers)))
+            chunks = [html_files[i:i + chunk_size] for i in range(0, n_files, chunk_size)]
+            next_report = PLAIN_PROGRESS_EVERY
+
+            with pool_ctx as executor:
+                # Handle results in completion order so a slow chunk doesn't hold up the rest
+                futures = {executor.submit(parse_batch, chunk, json_dir, cache_dir): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    for res in future.result():
+                        if res:
+                            jsonl_f.write(dump_json_bytes(res) + b"\n")
+
+                            csv_writer.writerow(flatten_for_csv(res))
+                            n_records += 1
+
+                    n_done += len(futures[future])
+                    if use_rich:
+                        progress.update(task, advance=len(futures[future]))
+                    elif n_done >= next_report or n_done == n_files:
+                        print(f"Parsed {n_done}/{n_files} files")
+                        next_report = n_done + PLAIN_PROGRESS_EVERY
+
+    print(f"Done: {n_records} files processed.")
+    print(f"Combined JSONL: {jsonl_path}")
+    print(f"Combined CSV: {csv_path}")
+    return n_records
 
 
 def main():
@@ -2,8 +2,10 @@
 # fetch nsf funding opportunities csv with auto waf token via headless chrome
 
 import argparse
+import json
 import time
 from datetime import datetime
+from pathlib import Path
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -16,6 +18,10 @@ console = Console()
 CSV_URL = "https://www.nsf.gov/funding/opps/csvexport?page&_format=csv"
 MAIN_URL = "https://www.nsf.gov/funding/opportunities"
 IMPERSONATE = "chrome131"
+WAF_WAIT_SECS = 25
+WAF_POLL_SECS = 0.05
+WAF_CACHE_PATH = Path.home() / ".cache" / "nsf_waf.json"
+WAF_CACHE_TTL = 600  # seconds a cached token is trusted
 
 HEADERS = {
     "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -52,46 +58,113 @@ def get_waf_token():
     })
 
     try:
+        driver.execute_cdp_cmd("Network.enable", {})
         driver.get(MAIN_URL)
-        for i in range(25):
-            time.sleep(1)
-            cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
-            if "aws-waf-token" in cookies:
-                console.print(f"[dim]→ got waf token after {i+1}s[/dim]")
-                return cookies["aws-waf-token"]
-        console.print("[yellow]⚠ waf token not found after 25s[/yellow]")
+        # poll tightly so we return as soon as the cookie lands
+        start = time.monotonic()
+        deadline = start + WAF_WAIT_SECS
+        while time.monotonic() < deadline:
+            for c in driver.get_cookies():
+                if c["name"] == "aws-waf-token":
+                    console.print(f"[dim]→ got waf token after {time.monotonic() - start:.1f}s[/dim]")
+                    return c["value"]
+            time.sleep(WAF_POLL_SECS)
+        console.print(f"[yellow]⚠ waf token not found after {WAF_WAIT_SECS:g}s[/yellow]")
         return None
     finally:
         driver.quit()
 
 
+def load_cached_token():
+    # token from a previous run, if still within ttl
+    try:
+        data = json.loads(WAF_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    # anything malformed counts as a miss
+    if not isinstance(data, dict):
+        return None
+    ts, token = data.get("ts"), data.get("token")
+    if not isinstance(ts, (int, float)) or isinstance(ts, bool) or not isinstance(token, str):
+        return None
+    if time.time() - ts >= WAF_CACHE_TTL:
+        return None
+    return token or None
+
+
+def save_cached_token(token):
+    try:
+        WAF_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        WAF_CACHE_PATH.write_text(json.dumps({"token": token, "ts": time.time()}), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def clear_cached_token():
+    try:
+        WAF_CACHE_PATH.unlink()
+    except OSError:
+        pass
+
+
+def is_waf_blocked(resp):
+    # waf answers with 403 or an html challenge page instead of csv
+    if resp.status_code == 403:
+        return True
+    head = resp.text.lstrip()[:20].lower()
+    return head.startswith("<!doctype") or head.startswith("<html")
+
+
+def download_csv(token):
+    session = creq.Session()
+    session.cookies.set("aws-waf-token", token, domain=".nsf.gov")
+    with console.status("[bold blue]fetching csv..."):
+        headers = {**HEADERS, "referer": "https://www.nsf.gov/funding/opportunities?page=1"}
+        return session.get(CSV_URL, headers=headers, impersonate=IMPERSONATE, timeout=60)
+
+
 def fetch_nsf_csv(output_path=None, cookie=None):
     console.print(Panel(f"[bold]target:[/bold] {CSV_URL}", title="[bold cyan]nsf csv fetcher[/bold cyan]", border_style="cyan"))
 
-    # get waf token
+    # get waf token: explicit flag, then cache, then chrome
     token = cookie
+    cached = False
     if token:
         console.print("[dim]→ using provided waf token[/dim]")
     else:
-        token = get_waf_token()
+        token = load_cached_token()
+        cached = token is not None
+        if cached:
+            console.print("[dim]→ using cached waf token[/dim]")
+        else:
+            token = get_waf_token()
+            if token:
+                save_cached_token(token)
 
     if not token:
         console.print("[red]✗ failed to get waf token — use --cookie flag[/red]")
         return None
 
     # fetch csv with token
-    session = creq.Session()
-    session.cookies.set("aws-waf-token", token, domain=".nsf.gov")
-
-    with console.status("[bold blue]fetching csv..."):
-        headers = {**HEADERS, "referer": "https://www.nsf.gov/funding/opportunities?page=1"}
-        resp = session.get(CSV_URL, headers=headers, impersonate=IMPERSONATE, timeout=60)
-        resp.raise_for_status()
-
-    content = resp.text
-    if content.strip().startswith("<!DOCTYPE") or content.strip().startswith("<html"):
+    resp = download_csv(token)
+    if cached and is_waf_blocked(resp):
+        # cached token went stale before its ttl; solve waf again once
+        console.print("[dim]→ cached waf token rejected, refreshing...[/dim]")
+        clear_cached_token()
+        token = get_waf_token()
+        if not token:
+            console.print("[red]✗ failed to get waf token — use --cookie flag[/red]")
+            return None
+        save_cached_token(token)
+        resp = download_csv(token)
+
+    if is_waf_blocked(resp):
+        if not cookie:
+            clear_cached_token()
         console.print("[red]✗ waf blocked — token may have expired[/red]")
         return None
+    resp.raise_for_status()
+    content = resp.text
 
     fname = output_path or f"nsf_opps_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     with open(fname, "w", encoding="utf-8") as f:
@@ -1,18 +1,23 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import csv
-import hashlib
+import gzip
 import json
 import os
+import random
 import re
 import sys
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
+import aiofiles
+import aiofiles.os
+import httpx
+import xxhash
 from rich.console import Console
 from rich.progress import (
     BarColumn,
@@ -23,36 +28,61 @@ from rich.progress import (
     TimeRemainingColumn,
 )
 from rich.table import Table
+from selectolax.lexbor import LexborHTMLParser
+
+try:
+    import orjson  # faster JSON encoding for results.jsonl when available
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # faster event loop where available (not on Windows)
+except ImportError:
+    uvloop = None
 
 console = Console()
 
+RESULTS_BATCH = 64  # results.jsonl lines buffered per write
+RESULTS_FLUSH_SECS = 1.0  # ...or flushed at least this often
+PROGRESS_REFRESH_SECS = 0.1  # progress bar updated at most ~10x per second
+SPINNER_MAX_JOBS = 500  # larger runs drop the spinner column
+BACKOFF_CAP = 10.0  # longest single retry sleep, in seconds
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
+_QUOTE_CHARS = "\"'"
+
+
 def normalize_url(u: str) -> Optional[str]:
     if not u:
         return None
-    u = u.strip().strip('"').strip("'")
+    u = u.strip().strip(_QUOTE_CHARS).strip()
     if not u:
         return None
-    if u.startswith("http://") or u.startswith("https://"):
+    if u.startswith(("http://", "https://")):
         return u
     return "https://" + u
 
 
+_WS_RE = re.compile(r"\s+")
+_BAD_RE = re.compile(r"[^a-zA-Z0-9._ -]+")
+
+
 def safe_filename(s: str, max_len: int = 140) -> str:
     s = (s or "").strip()
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[^a-zA-Z0-9._ -]+", "_", s)
+    s = _WS_RE.sub(" ", s)
+    s = _BAD_RE.sub("_", s)
     s = s.replace(" ", "_")
     if len(s) > max_len:
         s = s[:max_len].rstrip("_")
     return s or "page"
 
 
-def sha1(s: str) -> str:
-    return hashlib.sha1(s.encode("utf-8", errors="ignore")).hexdigest()
+def url_hash(s: str) -> str:
+    # Only needs to be stable and well spread for filenames; no cryptographic strength required
+    return xxhash.xxh3_64_hexdigest(s.encode("utf-8", errors="ignore"))
 
 
 @dataclass
@@ -63,43 +93,76 @@ class Job:
     nsf_pd_num: Optional[str] = None
 
 
-def build_session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update(
-        {
+def result_line(res: Dict) -> bytes:
+    """One results.jsonl line as UTF-8 bytes, via orjson when installed."""
+    try:
+        if orjson is not None:
+            return orjson.dumps(res) + b"\n"
+        return (json.dumps(res, ensure_ascii=False) + "\n").encode("utf-8")
+    except (TypeError, UnicodeEncodeError):
+        # Lone surrogates (e.g. from a malformed CSV URL) aren't valid UTF-8; escape them instead
+        return (json.dumps(res) + "\n").encode("ascii")
+
+
+def build_client(concurrency: int = 16) -> httpx.AsyncClient:
+    # One client per run; with HTTP/2 many requests to a host share a single TCP+TLS connection
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency),
+        follow_redirects=True,
+        headers={
             "User-Agent": (
                 "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
                 "(KHTML, like Gecko) Chrome/120 Safari/537.36"
             ),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
-            "Connection": "keep-alive",
-        }
+            # Bodies are archived still gzip-encoded; see fetch_html / process_one
+            "Accept-Encoding": "gzip",
+        },
     )
-    return s
 
 
-def fetch_html(
-    session: requests.Session,
+async def fetch_html(
+    client: httpx.AsyncClient,
     url: str,
     timeout: float,
     retries: int,
     backoff: float,
-) -> Tuple[bool, Optional[int], str]:
+) -> Tuple[bool, Optional[int], Union[bytes, str], Optional[str]]:
+    """Returns (ok, status, encoded body bytes, Content-Encoding) on success,
+    (False, None, error message, None) otherwise."""
     last_err = None
+    loop = asyncio.get_running_loop()
+    # Wall-clock budget for all attempts of this URL
+    deadline = loop.time() + timeout * (retries + 1)
     for attempt in range(retries + 1):
         try:
-            r = session.get(url, timeout=timeout, allow_redirects=True)
-            if 200 <= r.status_code < 300:
-                return True, r.status_code, r.text
-            last_err = f"HTTP {r.status_code}"
-        except requests.RequestException as e:
+            async with client.stream("GET", url, timeout=timeout) as r:
+                if 200 <= r.status_code < 300:
+                    encoding = r.headers.get("Content-Encoding", "identity").strip().lower()
+                    # aiter_raw skips httpx's content decoding
+                    body = b"".join([chunk async for chunk in r.aiter_raw()])
+                    return True, r.status_code, body, encoding
+                last_err = f"HTTP {r.status_code}"
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+            # ValueError covers IDNAError / UnicodeEncodeError from malformed hosts and paths
             last_err = f"{type(e).__name__}: {e}"
 
         if attempt < retries:
-            time.sleep(backoff * (2 ** attempt))
+            # Jitter so concurrent failures don't retry in lockstep
+            delay = min(BACKOFF_CAP, backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+            if loop.time() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+
+    return False, None, (last_err or "Unknown error"), None
 
-    return False, None, (last_err or "Unknown error")
+
+def _cell(row: List[str], idx: Optional[int]) -> Optional[str]:
+    if idx is None or idx >= len(row):
+        return None
+    return row[idx].strip() or None
 
 
 def load_jobs_from_csv(path: str) -> List[Job]:
@@ -107,43 +170,50 @@ def load_jobs_from_csv(path: str) -> List[Job]:
         raise FileNotFoundError(f"CSV not found: {path}")
 
     jobs: List[Job] = []
+    seen = set()
     with open(path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        if not reader.fieldnames:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
             raise ValueError("CSV has no header row.")
 
         target_col = "Solicitation URL"
-        if target_col not in reader.fieldnames:
+        if target_col not in header:
             raise ValueError(
                 f'CSV missing required column "{target_col}". '
-                f"Found: {reader.fieldnames}"
+                f"Found: {header}"
             )
 
+        # Resolve column positions once; rows are read as plain lists
+        def col(name: str) -> Optional[int]:
+            return header.index(name) if name in header else None
+
+        url_idx = col(target_col)
+        title_idx = col("Title")
+        program_idx = col("Program ID")
+        pd_num_idx = col("NSF/PD Num")
+
         for row in reader:
-            url = normalize_url(row.get(target_col, ""))
-            if not url:
+            if url_idx >= len(row):
+                continue
+            url = normalize_url(row[url_idx])
+            # Deduplicate URLs while reading, keep first occurrence
+            if not url or url in seen:
                 continue
+            seen.add(url)
             jobs.append(
                 Job(
                     url=url,
-                    title=(row.get("Title") or "").strip() or None,
-                    program_id=(row.get("Program ID") or "").strip() or None,
-                    nsf_pd_num=(row.get("NSF/PD Num") or "").strip() or None,
+                    title=_cell(row, title_idx),
+                    program_id=_cell(row, program_idx),
+                    nsf_pd_num=_cell(row, pd_num_idx),
                 )
             )
 
-    # Deduplicate URLs, keep order
-    seen = set()
-    uniq: List[Job] = []
-    for j in jobs:
-        if j.url in seen:
-            continue
-        seen.add(j.url)
-        uniq.append(j)
-    return uniq
+    return jobs
 
 
-def output_path_for(job: Job, out_dir: str) -> str:
+def output_path_for(job: Job, out_dir: str, gz: bool = False) -> str:
     parts = []
     if job.nsf_pd_num:
         parts.append(job.nsf_pd_num)
@@ -153,19 +223,66 @@ def output_path_for(job: Job, out_dir: str) -> str:
         parts.append(job.title)
 
     base = safe_filename("__".join(parts)) if parts else safe_filename(job.url)
-    h = sha1(job.url)[:10]
-    return os.path.join(out_dir, f"{base}__{h}.html")
+    h = url_hash(job.url)[:10]
+    return os.path.join(out_dir, f"{base}__{h}.html.gz" if gz else f"{base}__{h}.html")
+
 
+def decode_body(payload: bytes, encoding: str) -> bytes:
+    """Undoes the Content-Encoding of a body read undecoded via httpx's aiter_raw()."""
+    if encoding in ("", "identity"):
+        return payload
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(payload)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(payload)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(payload, -zlib.MAX_WBITS)
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
 
-def process_one(
+
+def render_html(payload: bytes, encoding: str, pretty: bool) -> bytes:
+    """Re-serializes a page for --parse (Lexbor) or --pretty (BeautifulSoup) as UTF-8."""
+    payload = decode_body(payload, encoding)
+    if pretty:
+        # Pure-Python pretty-printer; only loaded when explicitly asked for
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(payload, "html.parser").prettify().encode("utf-8")
+    return LexborHTMLParser(payload).html.encode("utf-8")
+
+
+async def process_one(
     job: Job,
+    client: httpx.AsyncClient,
     out_dir: str,
     timeout: float,
     retries: int,
     backoff: float,
-) -> Dict:
-    session = build_session()
-    ok, status, payload = fetch_html(session, job.url, timeout, retries, backoff)
+    pretty: bool = False,
+    parse: bool = False,
+    force: bool = False,
+) -> Tuple[Dict, Optional[str], Optional[bytes]]:
+    """Fetches one job; returns (result, output path, payload) for the writer task to persist."""
+    if not force:
+        # A non-empty file this run could have written means there is nothing to fetch.
+        # --parse/--pretty always write plain .html; raw mode keeps .html.gz for gzip responses.
+        candidates = [output_path_for(job, out_dir)]
+        if not (parse or pretty):
+            candidates.append(output_path_for(job, out_dir, gz=True))
+        for path in candidates:
+            if os.path.isfile(path) and os.path.getsize(path) > 0:
+                res = {
+                    "url": job.url,
+                    "ok": True,
+                    "http_status": None,
+                    "error": None,
+                    "saved_path": path,
+                    "cached": True,
+                }
+                return res, None, None
+
+    ok, status, payload, encoding = await fetch_html(client, job.url, timeout, retries, backoff)
 
     res = {
         "url": job.url,
@@ -173,28 +290,34 @@ def process_one(
         "http_status": status,
         "error": None if ok else payload,
         "saved_path": None,
+        "cached": False,
     }
 
     if not ok:
-        return res
+        return res, None, None
 
-    soup = BeautifulSoup(payload, "html.parser")
-    html_pretty = soup.prettify()
-
-    os.makedirs(out_dir, exist_ok=True)
-    path = output_path_for(job, out_dir)
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        f.write(html_pretty)
+    # Archive the body exactly as served (gzip stays gzip); only decode when parsing is asked for
+    gz = encoding in ("gzip", "x-gzip") and not (parse or pretty)
+    try:
+        if parse or pretty:
+            # Decoding and parsing are CPU work; keep them off the event loop
+            payload = await asyncio.to_thread(render_html, payload, encoding, pretty)
+        elif not gz:
+            payload = decode_body(payload, encoding)
+    except (ValueError, OSError, EOFError, zlib.error) as e:
+        res["ok"] = False
+        res["error"] = f"{type(e).__name__}: {e}"
+        return res, None, None
 
-    res["saved_path"] = path
-    return res
+    return res, output_path_for(job, out_dir, gz), payload
 
 
-def run_scraping_jobs(jobs, out_dir, threads=16, timeout=25.0, retries=2, backoff=0.8, results_file="results.jsonl"):
+def run_scraping_jobs(jobs, out_dir, threads=16, timeout=25.0, retries=2, backoff=0.8, results_file="results.jsonl", pretty=False, parse=False, host_concurrency=4, force=False):
     os.makedirs(out_dir, exist_ok=True)
 
+    columns = [SpinnerColumn()] if len(jobs) <= SPINNER_MAX_JOBS else []
     progress = Progress(
-        SpinnerColumn(),
+        *columns,
         TextColumn("[bold]{task.description}"),
         BarColumn(),
         TextColumn("{task.completed}/{task.total}"),
@@ -209,17 +332,52 @@ def run_scraping_jobs(jobs, out_dir, threads=16, timeout=25.0, retries=2, backof
     fail_count = 0
     failures: List[Dict] = []
 
-    with open(results_file, "w", encoding="utf-8") as results_fp:
-        with progress:
-            with ThreadPoolExecutor(max_workers=max(1, threads)) as ex:
-                futs = [
-                    ex.submit(process_one, j, out_dir, timeout, retries, backoff)
-                    for j in jobs
-                ]
-                for fut in as_completed(futs):
-                    res = fut.result()
-                    results_fp.write(json.dumps(res, ensure_ascii=False) + "\n")
-                    results_fp.flush()
+    async def scrape_all():
+        # `threads` now bounds in-flight requests on one event loop rather than OS threads
+        concurrency = max(1, threads)
+        sem = asyncio.Semaphore(concurrency)
+        # Per-origin cap so a big `threads` value doesn't hammer a single host
+        host_sems: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max(1, host_concurrency))
+        )
+
+        # Fetchers hand finished pages to one writer task that owns every file write;
+        # the bound gives backpressure if the disk falls behind the network
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+
+        async def writer():
+            nonlocal ok_count, fail_count
+
+            async with aiofiles.open(results_file, "wb", buffering=1 << 20) as results_fp:
+                pending: List[bytes] = []
+                loop = asyncio.get_running_loop()
+                last_flush = loop.time()
+                done = 0
+                last_progress = 0.0
+
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    res, path, payload = item
+
+                    if path is not None:
+                        async with aiofiles.open(path, "wb") as f:
+                            await f.write(payload)
+                        # Drop the other format from an earlier run so the parser sees one file per page
+                        stale = path[:-3] if path.endswith(".gz") else path + ".gz"
+                        try:
+                            await aiofiles.os.remove(stale)
+                        except FileNotFoundError:
+                            pass
+                        res["saved_path"] = path
+
+                    pending.append(result_line(res))
+                    if len(pending) >= RESULTS_BATCH or loop.time() - last_flush >= RESULTS_FLUSH_SECS:
+                        await results_fp.write(b"".join(pending))
+                        await results_fp.flush()
+                        pending.clear()
+                        last_flush = loop.time()
 
                     if res["ok"]:
                         ok_count += 1
@@ -227,7 +385,48 @@ def run_scraping_jobs(jobs, out_dir, threads=16, timeout=25.0, retries=2, backof
                         fail_count += 1
                         failures.append(res)
 
-                    progress.advance(task_id)
+                    # Coalesce bar updates so render cost doesn't scale with URL count
+                    done += 1
+                    now = loop.time()
+                    if now - last_progress >= PROGRESS_REFRESH_SECS:
+                        progress.update(task_id, completed=done)
+                        last_progress = now
+
+                if pending:
+                    await results_fp.write(b"".join(pending))
+                progress.update(task_id, completed=done)
+
+        async with build_client(concurrency) as client:
+            async def bounded(job: Job) -> None:
+                try:
+                    host = urlparse(job.url).netloc
+                except ValueError as e:
+                    # e.g. "Invalid IPv6 URL": record it like any other failed fetch
+                    res = {
+                        "url": job.url,
+                        "ok": False,
+                        "http_status": None,
+                        "error": f"InvalidURL: {e}",
+                        "saved_path": None,
+                        "cached": False,
+                    }
+                    await queue.put((res, None, None))
+                    return
+
+                # Take the host slot first so waiting jobs don't hold global slots
+                async with host_sems[host], sem:
+                    item = await process_one(job, client, out_dir, timeout, retries, backoff, pretty, parse, force)
+                await queue.put(item)
+
+            async def fetch_all():
+                await asyncio.gather(*(bounded(j) for j in jobs))
+                await queue.put(None)
+
+            # Gathered together so a writer failure surfaces instead of blocking fetchers on a full queue
+            await asyncio.gather(fetch_all(), writer())
+
+    with progress:
+        (uvloop.run if uvloop is not None else asyncio.run)(scrape_all())
 
     table = Table(title="Scrape Summary")
     table.add_column("Total", justify="right")
@@ -262,11 +461,15 @@ def main():
 
     parser.add_argument("--csv", type=str, default="nsf_opps_20260221_143120.csv", help="CSV path (default: input.csv)")
     parser.add_argument("--out", type=str, default="html_out", help="Output directory")
-    parser.add_argument("--threads", type=int, default=16, help="Thread count")
+    parser.add_argument("--threads", type=int, default=16, help="Max concurrent requests")
+    parser.add_argument("--host-concurrency", type=int, default=4, help="Max concurrent requests per host")
     parser.add_argument("--timeout", type=float, default=25.0, help="Request timeout seconds")
     parser.add_argument("--retries", type=int, default=2, help="Retries per URL")
     parser.add_argument("--backoff", type=float, default=0.8, help="Retry backoff base seconds")
     parser.add_argument("--results", type=str, default="results.jsonl", help="JSONL results log")
+    parser.add_argument("--parse", action="store_true", help="Save HTML re-serialized by Lexbor instead of raw (possibly gzipped) bytes")
+    parser.add_argument("--force", action="store_true", help="Re-download URLs whose output file already exists (use when switching --parse/--pretty modes)")
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print saved HTML with BeautifulSoup (slow)")
 
     args = parser.parse_args()
 
@@ -288,7 +491,7 @@ def main():
         console.print("[yellow]No URLs to scrape.[/yellow]")
         sys.exit(0)
 
-    run_scraping_jobs(jobs, args.out, args.threads, args.timeout, args.retries, args.backoff, args.results)
+    run_scraping_jobs(jobs, args.out, args.threads, args.timeout, args.retries, args.backoff, args.results, args.pretty, args.parse, args.host_concurrency, args.force)
 
 
 if __name__ == "__main__":